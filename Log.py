@@ -6,9 +6,10 @@
 #   https://github.com/qcjames53/AJM-RouteSummaries
 
 from enum import Enum
-from inspect import getframeinfo, stack, Traceback
+from inspect import getframeinfo, currentframe, Traceback
 from pathlib import Path
 from datetime import datetime
+from time import time
 
 # Constants
 LOG_SHEET_TITLE = "Log"
@@ -24,81 +25,123 @@ class Severity(Enum):
     ERROR = "E"
     FAILURE = "F"
 
+# Severities from least to most severe
+SEVERITY_RANK = {
+    Severity.GENERAL: 0,
+    Severity.WARNING: 1,
+    Severity.ERROR: 2,
+    Severity.FAILURE: 3
+}
+
+# Severity labels, padded to the same width
+SEVERITY_LABELS = {
+    Severity.GENERAL: "[General] ",
+    Severity.WARNING: "[Warning] ",
+    Severity.ERROR: "[Error]   ",
+    Severity.FAILURE: "[Failure] "
+}
+
 class Log:
-    def __init__(self, log_method) -> None:
+    __slots__ = ("messages", "creation_time", "log_method", "min_rank")
+
+    def __init__(self, log_method, \
+        min_severity: Severity = Severity.GENERAL) -> None:
         self.messages = []
-        self.creation_time = datetime.now()
+        self.creation_time = time()
         self.log_method = log_method
+        self.min_rank = SEVERITY_RANK[min_severity]
 
     def __str__(self) -> str:
-        output = ""
-        for message in self.messages:
-            output += str(message) + '\n'
-        return output
+        return "".join(str(message) + '\n' for message in self.messages)
 
     def __repr__(self) -> str:
         return self.__str__()
 
     def logMessage(self, severity: Severity, message: str, \
         # Create the message
-        location: Traceback= None) -> None:
-        temp_message = LogMessage(self.log_method, severity, message, location)
+        location: Traceback= None, args: tuple = ()) -> None:
+        temp_message = LogMessage(self.log_method, severity, message, location, \
+            args)
         self.messages.append(temp_message)
 
         # Output the message
         temp_message.output()
 
-    def logGeneral(self, message: str):
-        location = getframeinfo(stack()[1][0])
-        self.logMessage(Severity.GENERAL, message, location)
+    def isEnabled(self, severity: Severity) -> bool:
+        # Messages below the minimum severity are dropped before any work is
+        # done on them
+        return SEVERITY_RANK[severity] >= self.min_rank
+
+    def logGeneral(self, message: str, *args):
+        if not self.isEnabled(Severity.GENERAL):
+            return
+        location = getframeinfo(currentframe().f_back, 0)
+        self.logMessage(Severity.GENERAL, message, location, args)
 
-    def logWarning(self, message: str):
-        location = getframeinfo(stack()[1][0])
-        self.logMessage(Severity.WARNING, message, location)
+    def logWarning(self, message: str, *args):
+        if not self.isEnabled(Severity.WARNING):
+            return
+        location = getframeinfo(currentframe().f_back, 0)
+        self.logMessage(Severity.WARNING, message, location, args)
 
-    def logError(self, message: str):
-        location = getframeinfo(stack()[1][0])
-        self.logMessage(Severity.ERROR, message, location)
+    def logError(self, message: str, *args):
+        if not self.isEnabled(Severity.ERROR):
+            return
+        location = getframeinfo(currentframe().f_back, 0)
+        self.logMessage(Severity.ERROR, message, location, args)
 
-    def logFailure(self, message: str):
-        location = getframeinfo(stack()[1][0])
-        self.logMessage(Severity.FAILURE, message, location)
+    def logFailure(self, message: str, *args):
+        if not self.isEnabled(Severity.FAILURE):
+            return
+        location = getframeinfo(currentframe().f_back, 0)
+        self.logMessage(Severity.FAILURE, message, location, args)
 
 
 class LogMessage:
+    __slots__ = ("log_method", "creation_time", "severity", "message", \
+        "location", "args")
+
     def __init__(self, log_method, severity: Severity, message: str, \
-        location: Traceback) -> None:
+        location: Traceback, args: tuple = ()) -> None:
         self.log_method = log_method
-        self.creation_time = datetime.now()
+        # Stored as a float timestamp, only converted to a datetime if printed
+        self.creation_time = time()
         self.severity = severity
         self.message = message
         self.location = location
+        self.args = args
 
     def __str__(self) -> str:
-        output = ""
+        parts = []
         if LOG_PRINT_TIMESTAMP:
-            output = str(self.creation_time) + " "
+            parts.append(f"{datetime.fromtimestamp(self.creation_time)} ")
         if LOG_PRINT_SEVERITY:
-            if self.severity == Severity.GENERAL:
-                output += "[General] "
-            elif self.severity == Severity.WARNING:
-                output += "[Warning] "
-            elif self.severity == Severity.ERROR:
-                output += "[Error]   "
-            else:
-                output += "[Failure] "
+            parts.append(SEVERITY_LABELS.get(self.severity, "[Failure] "))
         if LOG_PRINT_MESSAGE:
-            output += self.message + " "
+            parts.append(f"{self.getMessage()} ")
         if LOG_PRINT_LOCATION:
-            output += "[" + self.getLocationShortFormatted() + "]"
-        return output
+            parts.append(f"[{self.getLocationShortFormatted()}]")
+        return "".join(parts)
 
     def __repr__(self) -> str:
         return self.__str__()
 
+    def getMessage(self) -> str:
+        # Messages are output as soon as they are logged, so the arguments are
+        # substituted right away. Only messages below the minimum severity
+        # skip formatting, since they are never created
+        if self.args:
+            try:
+                return self.message % self.args
+            except (TypeError, ValueError):
+                # A stray '%' in the message must not raise while logging
+                return " ".join([self.message] + \
+                    [str(arg) for arg in self.args])
+        return self.message
+
     def getLocationShortFormatted(self) -> str:
         file_name = Path(self.location.filename).stem 
-        return file_name + ":" + str(self.location.lineno)
+        return f"{file_name}:{self.location.lineno}"
         
     def output(self) -> None:
         self.log_method(self.__str__())
\ No newline at end of file
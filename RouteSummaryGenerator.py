@@ -7,13 +7,15 @@
 # More details about this project can be found in the README file or at:
 #   https://github.com/qcjames53/AJM-RouteSummaries
 
-from calendar import c
-from turtle import color
 import openpyxl
 from openpyxl.styles import Alignment, PatternFill, Color
+from openpyxl.cell import WriteOnlyCell
 import datetime
 from enum import Enum
 from typing import Dict, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from bisect import insort
 
 from Log import Log
 
@@ -30,57 +32,97 @@ class Direction(Enum):
 
     # implemented to allow for sorting by direction
     def __lt__(self, other):
-        return str(self) < str(other)
+        return self.value < other.value
 
 # Utility functions
+# Lookup table from direction strings to direction enums
+DIRECTION_STRINGS = {direction.value: direction for direction in Direction}
+
+@lru_cache(maxsize=32)
 def stringToDirection(dir_string) -> Direction:
     """
-    Converts a direction string to a direction enum
+    Converts a direction string to a direction enum. Surrounding whitespace and
+    letter case are ignored. Memoized since input files only use a handful of
+    direction strings.
 
     @param dir_string The string to convert
     @returns Direction enum for the direction of this string
     """
-    direction = Direction.UN
-    if dir_string == "IB":
-        direction = Direction.IB
-    elif dir_string == "OB":
-        direction = Direction.OB
-    elif dir_string == "NB":
-        direction = Direction.NB
-    elif dir_string == "SB":
-        direction = Direction.SB
-    elif dir_string == "EB":
-        direction = Direction.EB
-    elif dir_string == "WB":
-        direction = Direction.WB
-    elif dir_string == "LP":
-        direction = Direction.LP
-    return direction
+    return DIRECTION_STRINGS.get(str(dir_string).strip().upper(), Direction.UN)
+
+
+# Memoized column number to column letter conversion
+getColumnLetter = lru_cache(maxsize=1024)(openpyxl.utils.get_column_letter)
+
+@lru_cache(maxsize=None)
+def formatHourMinute(time) -> str:
+    """
+    Formats a time of day for the reports. Memoized since routes share a
+    small set of start times.
+
+    @param time The datetime.time to format
+    @returns The time as an HH:MM string
+    """
+    return time.strftime("%H:%M")
+
+# Shared cell styles for the output sheets
+RIGHT_ALIGNMENT = Alignment(horizontal="right")
+TIMED_STOP_FILL = PatternFill(patternType="solid", fill_type="solid", \
+    fgColor=Color("FFFF00"))
+
+def styledCell(worksheet, value, alignment=None, fill=None) -> WriteOnlyCell:
+    """
+    Creates a styled cell that can be passed to worksheet.append()
+
+    @param worksheet The worksheet the cell will be appended to
+    @param value The value of the cell
+    @param alignment The alignment of the cell, or None for the default
+    @param fill The fill of the cell, or None for no fill
+    @returns The styled cell
+    """
+    cell = WriteOnlyCell(worksheet, value)
+    if alignment is not None:
+        cell.alignment = alignment
+    if fill is not None:
+        cell.fill = fill
+    return cell
 
 
 class RouteManager:
     """ 
     A class that allows for easy storage of routes and their respective data
     """
+    __slots__ = ("routes", "sorted_route_keys", "log")
+
     def __init__(self, log:Log) -> None:
         """
         Initilize RouteManager with the appropriate internal variables
         
         @param log The log object in the currect workbook
         """
-        # A map of routes from routestring to route object
+        # A map of routes from (route, direction) to route object
         self.routes = {}
+        self.sorted_route_keys = None
         self.log = log
 
     def __str__(self) -> str:
-        output = ""
-        for key in sorted(self.routes.keys()):
-            output += self.routes[key].__str__() + '\n'
-        return output
+        return "".join(str(self.routes[key]) + '\n' \
+            for key in self.route_keys)
 
     def __repr__(self) -> str:
         return self.__str__()
 
+    @property
+    def route_keys(self) -> list:
+        """
+        The (route, direction) keys of all routes in sorted order
+
+        @returns The sorted list of keys. Do not modify it.
+        """
+        if self.sorted_route_keys is None:
+            self.sorted_route_keys = sorted(self.routes.keys())
+        return self.sorted_route_keys
+
     def addStop(self, route, direction: Direction, stop_no, street, cross_street, is_timed) -> None:
         """
         Adds a stop to the specified route object.
@@ -92,11 +134,14 @@ class RouteManager:
         @param is_timed True if this is a timed stop
         """
         # if the route key does not exist, create the route
-        if (route, direction) not in self.routes:
-            self.routes[(route, direction)] = Route(route, direction, self.log)
+        route_obj = self.routes.get((route, direction))
+        if route_obj is None:
+            route_obj = Route(route, direction, self.log)
+            self.routes[(route, direction)] = route_obj
+            self.sorted_route_keys = None
         
         # Add the stop to the appropriate route
-        self.routes[(route, direction)].addStop(stop_no, street, cross_street, is_timed)
+        route_obj.addStop(stop_no, street, cross_street, is_timed)
 
     def addData(self, route, direction: Direction, stop_no, datetime, run, arrival_time, \
         schedule_time, offs, ons, onboard) -> bool:
@@ -115,12 +160,14 @@ class RouteManager:
         @returns Boolean of whether the data was successfully added
         """
         # If the route does not exist, log an error and return
-        if (route, direction) not in self.routes:
-            self.log.logError(f"Tried to add data to nonexistent route: {route} {direction}")
+        route_obj = self.routes.get((route, direction))
+        if route_obj is None:
+            self.log.logError("Tried to add data to nonexistent route: %s %s", \
+                route, direction)
             return False
 
         # Add the data to the appropriate route
-        return self.routes[(route, direction)].addData(stop_no, datetime, run, arrival_time,\
+        return route_obj.addData(stop_no, datetime, run, arrival_time, \
             schedule_time, offs, ons, onboard)
 
     def setRouteData(self, route, description, direction: Direction) -> None:
@@ -132,11 +179,14 @@ class RouteManager:
         @param direction The direction of the route as a Direction object
         """
         # if the route key does not exist, create the route
-        if route not in self.routes:
-            self.routes[(route, direction)] = Route(route, direction, self.log)
+        route_obj = self.routes.get((route, direction))
+        if route_obj is None:
+            route_obj = Route(route, direction, self.log)
+            self.routes[(route, direction)] = route_obj
+            self.sorted_route_keys = None
 
         # Add data to appropriate route
-        self.routes[(route, direction)].setRouteData(description)
+        route_obj.setRouteData(description)
 
     def setCityName(self, name) -> None:
         """
@@ -144,15 +194,15 @@ class RouteManager:
 
         @param name The name of this city / project
         """
-        for route in self.routes:
-            self.routes[route].setCityName(name)
+        for route in self.routes.values():
+            route.setCityName(name)
 
     def buildLoad(self) -> None:
         """
         Builds and saves the loads for all routes
         """
-        for key in self.routes:
-            self.routes[key].buildLoad()
+        for route in self.routes.values():
+            route.buildLoad()
 
     def buildRouteTotals(self, worksheet) -> None:
         """
@@ -160,34 +210,29 @@ class RouteManager:
 
         @param worksheet The excel worksheet to operate on
         """
-        # Display headers
-        worksheet["A1"] = "Route #"
-        worksheet["A1"].alignment = Alignment(horizontal="right")
-        worksheet["C1"] = "Route"
-        worksheet["D1"] = "Ons"
-        worksheet["D1"].alignment = Alignment(horizontal="right")
-        worksheet["E1"] = "Offs"
-        worksheet["E1"].alignment = Alignment(horizontal="right")
-        worksheet["F1"] = "Total"
-        worksheet["F1"].alignment = Alignment(horizontal="right")
-
         # Set the width of the columns
         worksheet.column_dimensions["A"].width = 8
         worksheet.column_dimensions["B"].width = 1
         worksheet.column_dimensions["C"].width = 30
-        
-        # Display values
-        current_row = 2
-        for key in sorted(self.routes.keys()):
-            offs, ons, total = self.routes[key].getTotalOffsAndOns()
-            worksheet.cell(row=current_row, column=1).value = key[0]
-            worksheet.cell(row=current_row, column=3).value = \
-                self.routes[key].getDescriptorAndDirectionTrunc(29)
-            worksheet.cell(row=current_row, column=4).value = ons
-            worksheet.cell(row=current_row, column=5).value = offs
-            worksheet.cell(row=current_row, column=6).value = total
 
-            current_row += 1
+        # Display headers
+        worksheet.append([
+            styledCell(worksheet, "Route #", RIGHT_ALIGNMENT),
+            None,
+            "Route",
+            styledCell(worksheet, "Ons", RIGHT_ALIGNMENT),
+            styledCell(worksheet, "Offs", RIGHT_ALIGNMENT),
+            styledCell(worksheet, "Total", RIGHT_ALIGNMENT)
+        ])
+
+        # Display values
+        routes = self.routes
+        append = worksheet.append
+        for key in self.route_keys:
+            route = routes[key]
+            offs, ons, total = route.getTotalOffsAndOns()
+            append([key[0], None, route.getDescriptorAndDirectionTrunc(29), \
+                ons, offs, total])
 
 
     def buildMaxLoads(self, worksheet) -> None:
@@ -197,29 +242,29 @@ class RouteManager:
 
         @param worksheet The excel worksheet to operate on
         """
-        # Display headers
-        worksheet["A1"] = "Route #"
-        worksheet["A1"].alignment = Alignment(horizontal="right")
-        worksheet["C1"] = "Route"
-        worksheet["D1"] = "Start Time"
-        worksheet["E1"] = "Ons"
-        worksheet["E1"].alignment = Alignment(horizontal="right")
-        worksheet["F1"] = "Offs"
-        worksheet["F1"].alignment = Alignment(horizontal="right")
-        worksheet["G1"] = "Max Load"
-        worksheet["G1"].alignment = Alignment(horizontal="right")
-
         # Set the width of the columns
         worksheet.column_dimensions["A"].width = 8
         worksheet.column_dimensions["B"].width = 1
         worksheet.column_dimensions["C"].width = 30
         worksheet.column_dimensions["D"].width = 10
 
+        # Display headers
+        worksheet.append([
+            styledCell(worksheet, "Route #", RIGHT_ALIGNMENT),
+            None,
+            "Route",
+            "Start Time",
+            styledCell(worksheet, "Ons", RIGHT_ALIGNMENT),
+            styledCell(worksheet, "Offs", RIGHT_ALIGNMENT),
+            styledCell(worksheet, "Max Load", RIGHT_ALIGNMENT)
+        ])
+
         # Display values
-        current_row = 2
-        for key in sorted(self.routes.keys()):
-            current_row = self.routes[key].buildTotalsByTime(worksheet,\
-            current_row)
+        routes = self.routes
+        append = worksheet.append
+        for key in self.route_keys:
+            for row in routes[key].iterTotalsByTime():
+                append(row)
 
     def buildRouteTotalsByStop(self, worksheet) -> None:
         """
@@ -238,35 +283,25 @@ class RouteManager:
         worksheet.column_dimensions["G"].width = 15
 
         # Display values
-        current_row = 0
-        for key in sorted(self.routes.keys()):
+        for key in self.route_keys:
             # Display headers
-            current_row += 1
-            worksheet.cell(row=current_row, column=1).value = "Route #"
-            worksheet.cell(row=current_row, column=1).alignment = \
-                Alignment(horizontal="right")
-            worksheet.cell(row=current_row, column=3).value = "Route"
-            worksheet.cell(row=current_row, column=4).value = "Stop"
-            worksheet.cell(row=current_row, column=4).alignment = \
-                Alignment(horizontal="right")
-            worksheet.cell(row=current_row, column=6).value = "Street"
-            worksheet.cell(row=current_row, column=7).value = "Cross Street"
-            worksheet.cell(row=current_row, column=8).value = "Ons"
-            worksheet.cell(row=current_row, column=8).alignment = \
-                Alignment(horizontal="right")
-            worksheet.cell(row=current_row, column=9).value = "Offs"
-            worksheet.cell(row=current_row, column=9).alignment = \
-                Alignment(horizontal="right")
-            worksheet.cell(row=current_row, column=10).value = "Total"
-            worksheet.cell(row=current_row, column=10).alignment = \
-                Alignment(horizontal="right")
-            worksheet.cell(row=current_row, column=11).value = "Load"
-            worksheet.cell(row=current_row, column=11).alignment = \
-                Alignment(horizontal="right")
+            worksheet.append([
+                styledCell(worksheet, "Route #", RIGHT_ALIGNMENT),
+                None,
+                "Route",
+                styledCell(worksheet, "Stop", RIGHT_ALIGNMENT),
+                None,
+                "Street",
+                "Cross Street",
+                styledCell(worksheet, "Ons", RIGHT_ALIGNMENT),
+                styledCell(worksheet, "Offs", RIGHT_ALIGNMENT),
+                styledCell(worksheet, "Total", RIGHT_ALIGNMENT),
+                styledCell(worksheet, "Load", RIGHT_ALIGNMENT)
+            ])
 
             # Display stop information
-            current_row = self.routes[key].buildRouteTotalsByStop(worksheet, \
-                current_row + 1)
+            for row in self.routes[key].iterRouteTotalsByStop(worksheet):
+                worksheet.append(row)
 
     def buildOnTimeDetail(self, worksheet) -> None:
         """
@@ -275,28 +310,26 @@ class RouteManager:
 
         @param worksheet The excel worksheet to operate on
         """
-        # Display headers
-        worksheet["A1"] = "Route #"
-        worksheet["A1"].alignment = Alignment(horizontal="right")
-        worksheet["C1"] = "Route Name"
-        worksheet["D1"] = "Date"
-        worksheet["D1"].alignment = Alignment(horizontal="right")
-        worksheet["E1"] = "Time"
-        worksheet["E1"].alignment = Alignment(horizontal="right")
-        worksheet["F1"] = "Run"
-        worksheet["F1"].alignment = Alignment(horizontal="right")
-
         # Set the width of the columns
         worksheet.column_dimensions["A"].width = 8
         worksheet.column_dimensions["B"].width = 1
         worksheet.column_dimensions["C"].width = 12
         worksheet.column_dimensions["D"].width = 11
 
+        # Display headers
+        worksheet.append([
+            styledCell(worksheet, "Route #", RIGHT_ALIGNMENT),
+            None,
+            "Route Name",
+            styledCell(worksheet, "Date", RIGHT_ALIGNMENT),
+            styledCell(worksheet, "Time", RIGHT_ALIGNMENT),
+            styledCell(worksheet, "Run", RIGHT_ALIGNMENT)
+        ])
+
         # Display values
-        current_row = 2
-        for key in sorted(self.routes.keys()):
-            current_row = self.routes[key].buildOnTimeDetail(worksheet, \
-                current_row)
+        for key in self.route_keys:
+            for row in self.routes[key].iterOnTimeDetail(worksheet):
+                worksheet.append(row)
 
     def buildDetailReport(self, worksheet) -> None:
         """
@@ -305,22 +338,30 @@ class RouteManager:
 
         @param worksheet The excel worksheet to operate on
         """
-        # Set column widths
+        # Set column widths, including the date column of every time slot
         worksheet.column_dimensions["A"].width = 1
         worksheet.column_dimensions["B"].width = 4
         worksheet.column_dimensions["C"].width = 11
         worksheet.column_dimensions["D"].width = 11
+        max_times = max((len(route.time_set) for route in \
+            self.routes.values()), default=0)
+        for col in range(5, 5 + 3 * max_times, 3):
+            worksheet.column_dimensions[getColumnLetter(col)].width = 11
 
-        current_row = 1
-        for key in sorted(self.routes.keys()):
-            current_row = self.routes[key].buildDetailReport(worksheet, \
-                current_row)
+        for key in self.route_keys:
+            for row in self.routes[key].iterDetailReport():
+                worksheet.append(row)
 
 
 class Route:
     """
     A class that allows for easy storage of the stops inside of a route
     """
+    __slots__ = ("route", "stops", "sorted_stop_nos", "time_set", \
+        "sorted_times", "descriptor", "direction", "direction_string", \
+        "descriptor_and_direction", "descriptor_truncs", "log", "timed_stops", \
+        "onboard", "city_name")
+
     def __init__(self, route, direction: Direction, log:Log) -> None:
         """
         Initialize Route with the appropriate internal variables
@@ -331,23 +372,48 @@ class Route:
         """
         self.route = route
         self.stops = {}
-        self.times = []
+        self.sorted_stop_nos = None
+        self.time_set = set()
+        self.sorted_times = None
         self.descriptor = "Descriptor Unset"
         self.direction = direction
+        self.direction_string = direction.value if direction else Direction.UN.value
+        self.descriptor_and_direction = None
+        self.descriptor_truncs = {}
         self.log = log
         self.timed_stops = []
         self.onboard = {}
         self.city_name = "City Name Unset"
 
     def __str__(self) -> str:
-        output = ""
-        for key in sorted(self.stops.keys()):
-            output += str(self.stops[key])
-        return output
+        return "".join(str(self.stops[key]) for key in self.stop_order)
 
     def __repr__(self) -> str:
         return self.__str__()
 
+    @property
+    def stop_order(self) -> list:
+        """
+        The stop numbers of this route in sorted order
+
+        @returns The sorted list of stop numbers. Do not modify it.
+        """
+        if self.sorted_stop_nos is None:
+            self.sorted_stop_nos = sorted(self.stops.keys())
+        return self.sorted_stop_nos
+
+    @property
+    def times(self) -> list:
+        """
+        The datetimes this route has data for, sorted by time then date
+
+        @returns The sorted list of datetimes. Do not modify it.
+        """
+        if self.sorted_times is None:
+            self.sorted_times = sorted(self.time_set, \
+                key=lambda x: (x.time(), x.date()))
+        return self.sorted_times
+
     def addStop(self, stop_no, street, cross_street, is_timed) -> None:
         """
         Adds a stop of stop_no to this route
@@ -359,16 +425,18 @@ class Route:
         """
         # If stop exists, throw error and return
         if stop_no in self.stops:
-            self.log.logError("Tried to add stop " + str(stop_no) + " to route " + str(self.route) + " when it already exists.")
+            self.log.logError("Tried to add stop %s to route %s when it " + \
+                "already exists.", stop_no, self.route)
             return
 
-        # If timed stop, add to timed stops list
+        # If timed stop, add to timed stops list, keeping it sorted
         if is_timed:
-            self.timed_stops.append(stop_no)
-            self.timed_stops.sort()
+            insort(self.timed_stops, stop_no)
 
-        self.stops[stop_no] = Stop(self.route, stop_no, street, cross_street, self.log)
-        self.stops[stop_no].setRouteData(self.descriptor, self.direction)
+        stop = Stop(self.route, stop_no, street, cross_street, self.log)
+        stop.setRouteData(self.descriptor, self.direction)
+        self.stops[stop_no] = stop
+        self.sorted_stop_nos = None
 
     def addData(self, stop_no, datetime, run, arrival_time, schedule_time, \
         offs, ons, onboard) -> bool:
@@ -380,36 +448,38 @@ class Route:
         @param run The run value for this stop
         @param arrival_time Optional: The arrival time for this stop
         @param schedule_time Optional: The scheduled arrival time for this stop
-        @param offs Optional: The number of passengers departing the bus
-        @param ons Optional: The number of passengers boarding the bus
+        @param offs The non-negative number of passengers departing the bus
+        @param ons The non-negative number of passengers boarding the bus
         @param onboard The number of passengers carrying over from a prev route
         @returns Boolean of whether the data was successfully added
         """
         # If stop_no does not exist, throw error and return
-        if stop_no not in self.stops:
-            self.log.logError("Tried to add data to stop " + str(stop_no) + " in route " + str(self.route) + " " + str(self.direction) + " when stop does not exist.")
+        stop = self.stops.get(stop_no)
+        if stop is None:
+            self.log.logError("Tried to add data to stop %s in route %s %s " + \
+                "when stop does not exist.", stop_no, self.route, self.direction)
             return False
 
-        # If datetime does not exist, add it to datetimes and sort
-        if datetime not in self.times:
-            self.times.append(datetime)
-
-            # Sort by time, date instead of date, time
-            self.times.sort(key=lambda x: (x.time(), x.date()))
+        # If datetime does not exist, add it to datetimes. The sorted list is
+        # rebuilt the next time it is read.
+        if datetime not in self.time_set:
+            self.time_set.add(datetime)
+            self.sorted_times = None
 
         # Set the onboard value for this route if the value is provided
         if onboard is not None:
             # Log a warning if we're changing an already set onboard number
-            if datetime in self.onboard and self.onboard[datetime] != onboard:
-                self.log.logWarning("Route " + str(self.route) + " " + str(self.direction) + " time " + \
-                    str(datetime) + " stop " + str(stop_no) + \
-                    "Overriding onboard value " + str(self.onboard[datetime]) +\
-                    " with new value " + str(onboard))
+            previous_onboard = self.onboard.get(datetime)
+            if previous_onboard is not None and previous_onboard != onboard:
+                self.log.logWarning("Route %s %s time %s stop %s: Overriding " + \
+                    "onboard value %s with new value %s", self.route, \
+                    self.direction, datetime, stop_no, previous_onboard, \
+                    onboard)
             # Set the value regardless
             self.onboard[datetime] = onboard
 
-        return self.stops[stop_no].addData(datetime, run, arrival_time, \
-            schedule_time, offs, ons)
+        return stop.addData(datetime, run, arrival_time, schedule_time, offs, \
+            ons)
 
     def setRouteData(self, description) -> None:
         """
@@ -418,10 +488,12 @@ class Route:
         @param description A text description of the route (University, Uptown)
         """
         self.descriptor = description
+        self.descriptor_and_direction = None
+        self.descriptor_truncs = {}
 
         # Set for all child stops
-        for stop_no in self.stops:
-            self.stops[stop_no].setRouteData(description, direction)
+        for stop in self.stops.values():
+            stop.setRouteData(description, self.direction)
 
     def setCityName(self, name) -> None:
         """
@@ -435,29 +507,43 @@ class Route:
         """
         Builds and saves the loads for all data points within this route
         """
-        times_by_datetime = sorted(self.times)
-        current_load = 0
+        log = self.log
+        times_by_datetime = sorted(self.time_set)
+
+        # Stops are visited in stop number order for every datetime, so sort
+        # them once up front and keep their data dicts at hand. Every load is
+        # rewritten below, so the cached totals are cleared here once per stop
+        # rather than on every setLoad call.
+        stops_in_order = []
+        for stop_no in self.stop_order:
+            stop = self.stops[stop_no]
+            stop.totals = None
+            stops_in_order.append((stop_no, stop.offs, stop.ons, stop.loads))
+
+        onboard = self.onboard
         for datetime in times_by_datetime:
             # Set the starting load to the onboard value (stored)
-            current_load = 0
-            if datetime in self.onboard:
-                current_load = self.onboard[datetime]
+            current_load = onboard.get(datetime, 0)
 
-            for stop_no in sorted(self.stops.keys()):
-                current_off, current_on = \
-                    self.stops[stop_no].getOffsAndOns(datetime)
-                current_load = current_load + current_on - current_off
-                self.stops[stop_no].setLoad(datetime, current_load)
+            for stop_no, offs, ons, loads in stops_in_order:
+                current_load += ons.get(datetime, 0) - offs.get(datetime, 0)
+                loads[datetime] = current_load
 
                 # Display an error if current_load drops below 0
                 if current_load < 0:
-                    self.log.logWarning(f"Route {self.route} {self.direction} {datetime} stop {stop_no}: The load has dropped below 0 (check for bad data)")
+                    log.logWarning("Route %s %s %s stop %s: The load has " + \
+                        "dropped below 0 (check for bad data)", self.route, \
+                        self.direction, datetime, stop_no)
 
     def getDescriptorAndDirection(self) -> str:
         """
         @returns A string representation of this routes descriptor and direction
         """
-        return self.descriptor + " " + str(self.direction.value)
+        # Built on first use and reset whenever the route data changes
+        if self.descriptor_and_direction is None:
+            self.descriptor_and_direction = self.descriptor + " " + \
+                self.direction_string
+        return self.descriptor_and_direction
 
     def getDescriptorAndDirectionTrunc(self, l) -> str:
         """
@@ -465,8 +551,14 @@ class Route:
 
         @returns A truncated string representation of this route's descriptor and direction
         """
-        remaining_l = max(0, l - len(str(self.direction.value)) - 1)
-        return self.descriptor[0:remaining_l] + " " + str(self.direction.value)
+        # Cached by length since the reports ask for it on every row
+        descriptor_and_direction = self.descriptor_truncs.get(l)
+        if descriptor_and_direction is None:
+            remaining_l = max(0, l - len(self.direction_string) - 1)
+            descriptor_and_direction = self.descriptor[0:remaining_l] + " " + \
+                self.direction_string
+            self.descriptor_truncs[l] = descriptor_and_direction
+        return descriptor_and_direction
 
     def getTotalOffsAndOns(self) -> tuple:
         """
@@ -475,233 +567,193 @@ class Route:
         """
         offs = 0
         ons = 0
-        for stop_no in self.stops:
-            current_off, current_on = self.stops[stop_no].getTotalOffsAndOns()
+        for stop in self.stops.values():
+            current_off, current_on = stop.getTotalOffsAndOns()
             offs += current_off
             ons += current_on
         total = offs + ons
         return offs, ons, total
 
-    def buildTotalsByTime(self, worksheet, current_row) -> int:
+    def iterTotalsByTime(self):
         """
-        Output totals for every time of every route into a provided workbook
+        Generates the totals for every start time of this route
         
-        @param worksheet The workbook to output to
-        @param current_row The row of the worksheet to start on
-        @returns The next empty row in the worksheet
-        """
-        # Loop over every datetime
-        dt_search_index = 0
-        while dt_search_index < len(self.times):
-            # Get a list of all datetimes with the same start time as the
-            # current index
-            search_datetimes = [self.times[dt_search_index]]
-            dt_search_index += 1
-            while dt_search_index < len(self.times) and \
-                search_datetimes[0].time() == \
-                self.times[dt_search_index].time():
-                search_datetimes.append(self.times[dt_search_index])
-                dt_search_index += 1
-
-            # Generate totals and max for all stops for all datetimes in list
-            offs = 0
-            ons = 0
-            current_load = 0
-            max_load = 0
-            for datetime in search_datetimes:
-                for stop_no in self.stops:
-                    current_off, current_on, current_load = \
-                        self.stops[stop_no].getOffsOnsAndLoad(datetime)
-
-                    # Add to tallies
-                    offs += current_off
-                    ons += current_on
-
-                    # Save max load if is the current max
-                    if current_load > max_load:
-                        max_load = current_load
-
-            # Write data to sheet
-            worksheet.cell(row=current_row, column=1).value = self.route
-            worksheet.cell(row=current_row, column=3).value = \
-                self.getDescriptorAndDirectionTrunc(29)
-            worksheet.cell(row=current_row, column=4).value = \
-                datetime.strftime("%H:%M")
-            worksheet.cell(row=current_row, column=5).value = ons
-            worksheet.cell(row=current_row, column=6).value = offs
-            worksheet.cell(row=current_row, column=7).value = max_load
-
-            current_row += 1
-        return current_row
-
-    def buildRouteTotalsByStop(self, worksheet, current_row) -> int:
-        """
-        Builds total values for the route for each stop.
+        @returns A generator of worksheet rows, one per start time
+        """
+        # Every stop shares the route's datetimes, so find each one's start
+        # time of day once rather than once per stop and statistic
+        time_of = {datetime: datetime.time() for datetime in self.time_set}
+
+        # Tally every stop's data by start time of day in a single pass, so
+        # only datetimes a stop actually has data for are visited
+        offs_by_time = {}
+        ons_by_time = {}
+        max_load_by_time = {}
+        for stop in self.stops.values():
+            for datetime, offs in stop.offs.items():
+                start_time = time_of[datetime]
+                offs_by_time[start_time] = offs_by_time.get(start_time, 0) + offs
+            for datetime, ons in stop.ons.items():
+                start_time = time_of[datetime]
+                ons_by_time[start_time] = ons_by_time.get(start_time, 0) + ons
+            for datetime, load in stop.loads.items():
+                start_time = time_of[datetime]
+                max_load_by_time[start_time] = \
+                    max(load, max_load_by_time.get(start_time, 0))
+
+        # Generate one row per start time, the times are sorted by time first
+        route = self.route
+        descriptor = self.getDescriptorAndDirectionTrunc(29)
+        previous_time = None
+        for datetime in self.times:
+            start_time = time_of[datetime]
+            if start_time == previous_time:
+                continue
+            previous_time = start_time
 
-        @param worksheet The excel worksheet to operate on
-        @param current_row The row of the worksheet to start on
-        @returns The next empty row in the worksheet
+            yield [route, None, descriptor, \
+                formatHourMinute(start_time), ons_by_time.get(start_time, 0), \
+                offs_by_time.get(start_time, 0), \
+                max_load_by_time.get(start_time, 0)]
+
+    def iterRouteTotalsByStop(self, worksheet):
         """
-        # Include the onboard row
-        worksheet.cell(row=current_row, column=7).value = "Onboard"
+        Generates total values for the route for each stop.
 
-        # Get the total onboards for the route
+        @param worksheet The excel worksheet the rows will be appended to
+        @returns A generator of worksheet rows, ending with a blank row
+        """
+        # Include the onboard row with the total onboards for the route
         onboard_total = 0
         for time in self.onboard:
             onboard_total += self.onboard[time]
-        worksheet.cell(row=current_row, column=11).value = onboard_total
-        current_row += 1
+        yield [None, None, None, None, None, None, "Onboard", None, None, \
+            None, onboard_total]
 
         # Build totals for all stops
         running_totals = [0, 0, 0, onboard_total]
-        for stop_no in self.stops:
-            # if this stop is a timed stop, shade it yellow
-            if stop_no in self.timed_stops:
-                worksheet.cell(row=current_row, column=4).fill = \
-                    PatternFill(patternType="solid", fill_type="solid", fgColor=Color("FFFF00"))
-                worksheet.cell(row=current_row, column=5).fill = \
-                    PatternFill(patternType="solid", fill_type="solid", fgColor=Color("FFFF00"))
-                worksheet.cell(row=current_row, column=6).fill = \
-                    PatternFill(patternType="solid", fill_type="solid", fgColor=Color("FFFF00"))
-                worksheet.cell(row=current_row, column=7).fill = \
-                    PatternFill(patternType="solid", fill_type="solid", fgColor=Color("FFFF00"))
-                worksheet.cell(row=current_row, column=8).fill = \
-                    PatternFill(patternType="solid", fill_type="solid", fgColor=Color("FFFF00"))
-                worksheet.cell(row=current_row, column=9).fill = \
-                    PatternFill(patternType="solid", fill_type="solid", fgColor=Color("FFFF00"))
-                worksheet.cell(row=current_row, column=10).fill = \
-                    PatternFill(patternType="solid", fill_type="solid", fgColor=Color("FFFF00"))
-                worksheet.cell(row=current_row, column=11).fill = \
-                    PatternFill(patternType="solid", fill_type="solid", fgColor=Color("FFFF00"))
-
-            # input stop data
-            current_row, running_totals = self.stops[stop_no].buildRouteTotalsByStop( \
-                worksheet, current_row, running_totals)
+        timed_stops = set(self.timed_stops)
+        for stop_no, stop in self.stops.items():
+            row = stop.getRouteTotalsByStopRow(running_totals)
+
+            # if this stop is a timed stop, shade columns D-K yellow
+            if stop_no in timed_stops:
+                for index in range(3, 11):
+                    row[index] = styledCell(worksheet, row[index], \
+                        fill=TIMED_STOP_FILL)
+            yield row
 
         # Display totals
-        worksheet.cell(row=current_row, column=7).value = "Totals"
-        worksheet.cell(row=current_row, column=8).value = running_totals[0]
-        worksheet.cell(row=current_row, column=9).value = running_totals[1]
-        worksheet.cell(row=current_row, column=10).value = running_totals[2]
-        worksheet.cell(row=current_row, column=11).value = running_totals[3]
+        yield [None, None, None, None, None, None, "Totals"] + running_totals
+        yield []
 
-        return current_row + 1
+    def getMinutesLateMatrix(self) -> List[list]:
+        """
+        Builds the minutes late for every time at every timed stop in one pass.
 
-    def buildOnTimeDetail(self, worksheet, current_row) -> int:
+        @returns A list with one row per datetime in self.times. Each row holds
+            the minutes late for each timed stop, or "NA" if there is no data.
         """
-        Builds table of stops that are on time or not.
+        timed_data = [self.stops[stop_no].minutes_late \
+            for stop_no in self.timed_stops]
+        matrix = []
+        for datetime in self.times:
+            row = []
+            for minutes_late in timed_data:
+                value = minutes_late.get(datetime)
+                row.append("NA" if value is None else value)
+            matrix.append(row)
+        return matrix
 
-        @param worksheet The excel worksheet to operate on
-        @param current_row The row of the worksheet to start on
-        @returns The next empty row in the worksheet
+    def iterOnTimeDetail(self, worksheet):
+        """
+        Generates a table of stops that are on time or not.
+
+        @param worksheet The excel worksheet the rows will be appended to
+        @returns A generator of worksheet rows, ending with a blank row
         """
         # If there are no timed stops, skip this stop
         if len(self.timed_stops) == 0:
-            return current_row
+            return
 
         # Build header
-        col = 7
+        streets = [None, None, None, None, None, None]
+        cross_streets = [None, None, None, None, None, None]
         for stop in self.timed_stops:
-            worksheet.cell(row=current_row, column=col).value = \
-                self.stops[stop].getStreetTrunc(7)
-            worksheet.cell(row=current_row + 1, column=col).value = \
-                self.stops[stop].getCrossStreetTrunc(7)
-            col += 1
-        current_row += 2
+            streets.append(self.stops[stop].getStreetTrunc(7))
+            cross_streets.append(self.stops[stop].getCrossStreetTrunc(7))
+        yield streets
+        yield cross_streets
 
         # Generate one row per time
-        for datetime in self.times:
-            # Write route data to row
-            worksheet.cell(row=current_row, column=1).value = self.route
-            worksheet.cell(row=current_row, column=3).value = \
-                self.getDescriptorAndDirectionTrunc(10)
-            worksheet.cell(row=current_row, column=4).value = datetime.date()
-            worksheet.cell(row=current_row, column=5).value = datetime.time()
-            
-            # Write run number to row
-            worksheet.cell(row=current_row, column=6).value = \
-                self.stops[self.timed_stops[0]].getRun(datetime)
-            worksheet.cell(row=current_row, column=6).alignment = \
-                Alignment(horizontal="right")
-
-            # Write stop data to row
-            col = 7
-            for stop in self.timed_stops:
-                minutes_late = self.stops[stop].getMinutesLate(datetime)
-                # Handle error cases
-                if minutes_late is None:
-                    worksheet.cell(row=current_row, column=col).value = "NA"
-                else:
-                    worksheet.cell(row=current_row, column=col).value = \
-                        minutes_late
-                col += 1
-
-            current_row += 1
-        return current_row + 1
-
-    def buildDetailReport(self, worksheet, current_row) -> int:
-        """
-        Builds a detailed report of all data collected.
+        minutes_late_matrix = self.getMinutesLateMatrix()
+        for datetime, minutes_late_row in zip(self.times, minutes_late_matrix):
+            run = self.stops[self.timed_stops[0]].getRun(datetime)
+            yield [self.route, None, self.getDescriptorAndDirectionTrunc(10), \
+                datetime.date(), datetime.time(), \
+                styledCell(worksheet, run, RIGHT_ALIGNMENT)] + minutes_late_row
 
-        @param worksheet The excel worksheet to operate on
-        @param current_row The worksheet row to start on
-        @returns The next empty row in the worksheet
+        yield []
+
+    def iterDetailReport(self):
+        """
+        Generates a detailed report of all data collected.
+
+        @returns A generator of worksheet rows, ending with a blank row
         """
         # Skip if no data stored
         if self.times is None or len(self.times) == 0:
-            return current_row
+            return
 
         # Display the header
-        worksheet.cell(row=current_row, column=3).value = self.city_name
-        worksheet.cell(row=current_row + 1, column=3).value = "Route #" + str(self.route)
-        worksheet.cell(row=current_row + 1, column=4).value = \
-            self.getDescriptorAndDirection()
-        worksheet.cell(row=current_row + 3, column=3).value = "Stop Location"
-        worksheet.cell(row=current_row + 4, column=4).value = "Onboard"
+        yield [None, None, self.city_name]
+        yield [None, None, f"Route #{self.route}", \
+            self.getDescriptorAndDirection()]
 
         # Display the time headers, sort by time, date
         col_totals = {}
+        date_row = [None, None, None, None]
+        label_row = [None, None, "Stop Location", None]
+        onboard_row = [None, None, None, "Onboard"]
         col = 5
-        self.times.sort(key=lambda x: (x.time(), x.date()))
         for datetime in self.times:
-            worksheet.cell(row=current_row+2, column=col).value = \
-                datetime.date()
-            worksheet.cell(row=current_row+2, column=col+1).value = \
-                datetime.time()
-            worksheet.cell(row=current_row+3, column=col).value = "On"
-            worksheet.cell(row=current_row+3, column=col+1).value = "Off"
-            worksheet.cell(row=current_row+3, column=col+2).value = "OB"
-            worksheet.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 11
+            date_row += [datetime.date(), datetime.time(), None]
+            label_row += ["On", "Off", "OB"]
 
             # Display onboard if it exists
             if datetime in self.onboard:
-                worksheet.cell(row=current_row+4, column=col+2).value = \
-                self.onboard[datetime]
+                onboard_row += [None, None, self.onboard[datetime]]
                 col_totals[col + 2] = self.onboard[datetime]
             else:
-                worksheet.cell(row=current_row+4, column=col+2).value = 0
+                onboard_row += [None, None, 0]
 
             col += 3
+        yield date_row
+        yield label_row
+        yield onboard_row
 
         # Display the stops with info
-        current_row += 5
-        for stop_no in self.stops:
-            col_totals = self.stops[stop_no].buildDetailReport( \
-                worksheet, current_row, col_totals)
-            current_row += 1
+        for stop in self.stops.values():
+            row, col_totals = stop.getDetailReportRow(self.times, col_totals)
+            yield row
 
         # Display totals
-        worksheet.cell(row=current_row, column=4).value = "Totals"
+        totals_row = [None, None, None, "Totals"] + [None] * (col - 5)
         for col_key in col_totals:
-            worksheet.cell(row=current_row, column=col_key).value = col_totals[col_key]
-
-        return current_row + 2
+            totals_row[col_key - 1] = col_totals[col_key]
+        yield totals_row
+        yield []
             
 
 class Stop:
     """
     A class that represents a single stop on a bus route
     """
+    __slots__ = ("route", "stop_no", "street", "cross_street", "descriptor", \
+        "direction", "direction_string", "descriptor_and_direction", \
+        "descriptor_truncs", "log", "runs", "arrival_times", "schedule_times", \
+        "offs", "ons", "loads", "minutes_late", "totals")
+
     def __init__(self, route, stop_no, street, cross_street, log:Log) -> None:
         """
         Initialize with metadata
@@ -718,26 +770,36 @@ class Stop:
         self.cross_street = cross_street
         self.descriptor = "Descriptor Unset"
         self.direction = Direction.UN
+        self.direction_string = Direction.UN.value
+        self.descriptor_and_direction = None
+        self.descriptor_truncs = {}
         self.log = log
 
-        # Data is of the following format:
-        # [
-        #   run,
-        #   arrival_time,
-        #   schedule_time,
-        #   offs,
-        #   ons,
-        #   load
-        # ]
-        self.data = {}
+        # Data is stored as one dict per statistic, keyed by the datetime the
+        # route began. Every datetime with data has a load. The other dicts
+        # only hold datetimes added from the ride checks file, and
+        # minutes_late only holds datetimes with both an arrival and a
+        # schedule time.
+        self.runs = {}
+        self.arrival_times = {}
+        self.schedule_times = {}
+        self.offs = {}
+        self.ons = {}
+        self.loads = {}
+        self.minutes_late = {}
+
+        # Cached (offs, ons, load) sums over all datetimes, None when stale
+        self.totals = None
 
     def __str__(self) -> str:
-        output = str(self.route) + ": " + str(self.stop_no) + " [" + \
-            str(self.street) + "/" + str(self.cross_street) + "]\n"
-        for datetime in sorted(self.data.keys()):
-            output += str(datetime) + " " + str(self.data[datetime][0]) + " " + str(self.data[datetime][1]) + " " + str(self.data[datetime][2]) + " " + str(self.data[datetime][3]) + " " + str(self.data[datetime][4]) + "\n"
-        output += "\n"
-        return output
+        lines = [f"{self.route}: {self.stop_no} [{self.street}/{self.cross_street}]\n"]
+        for datetime in sorted(self.loads.keys()):
+            lines.append(f"{datetime} {self.runs.get(datetime)} " + \
+                f"{self.arrival_times.get(datetime)} " + \
+                f"{self.schedule_times.get(datetime)} " + \
+                f"{self.offs.get(datetime, 0)} {self.ons.get(datetime, 0)}\n")
+        lines.append("\n")
+        return "".join(lines)
 
     def __repr__(self) -> str:
         return self.__str__()
@@ -751,22 +813,29 @@ class Stop:
         @param run The run value of this stop
         @param arrival_time Optional: The arrival time for this stop
         @param schedule_time Optional: The scheduled arrival time for this stop
-        @param offs Optional: The number of passengers departing the bus
-        @param ons Optional: The number of passengers boarding the bus
+        @param offs The non-negative number of passengers departing the bus
+        @param ons The non-negative number of passengers boarding the bus
         @returns Boolean of whether the data was successfully added
         """
         # Check whether this data is a duplicate of an existing row
-        if datetime in self.data:
-            self.log.logError(f"Route {self.route} stop {self.stop_no} at {datetime}: Tried to overwrite existing data. Check input for duplicate rows.")
+        if datetime in self.loads:
+            self.log.logError("Route %s stop %s at %s: Tried to overwrite " + \
+                "existing data. Check input for duplicate rows.", self.route, \
+                self.stop_no, datetime)
             return False
 
-        # Clean input data
-        if not (isinstance(offs, int) and offs >= 0):
-            offs = 0
-        if not (isinstance(ons, int) and ons >= 0):
-            ons = 0
-
-        self.data[datetime] = [run, arrival_time, schedule_time, offs, ons, 0]
+        self.runs[datetime] = run
+        self.arrival_times[datetime] = arrival_time
+        self.schedule_times[datetime] = schedule_time
+        self.offs[datetime] = offs
+        self.ons[datetime] = ons
+        self.loads[datetime] = 0
+        self.totals = None
+
+        # Precompute how late the bus was so reports don't redo the math
+        if arrival_time is not None and schedule_time is not None:
+            delta = arrival_time - schedule_time
+            self.minutes_late[datetime] = round(delta.total_seconds() / 60)
         return True
 
     def setLoad(self, datetime, load) -> None:
@@ -776,11 +845,8 @@ class Stop:
         @param datetime The datetime when this route began
         @param load The passenger load
         """
-        # Add data if doesn't exist
-        if datetime not in self.data:
-            self.data[datetime] = [None, None, None, 0, 0, load]
-        else:
-            self.data[datetime][5] = load
+        self.loads[datetime] = load
+        self.totals = None
 
     def setRouteData(self, description, direction: Direction) -> None:
         """
@@ -791,12 +857,19 @@ class Stop:
         """
         self.descriptor = description
         self.direction = direction
+        self.direction_string = direction.value if direction else Direction.UN.value
+        self.descriptor_and_direction = None
+        self.descriptor_truncs = {}
 
     def getDescriptorAndDirection(self) -> str:
         """
         @returns A string representation of this routes descriptor and direction
         """
-        return self.descriptor + " " + str(self.direction.value)
+        # Built on first use and reset whenever the route data changes
+        if self.descriptor_and_direction is None:
+            self.descriptor_and_direction = self.descriptor + " " + \
+                self.direction_string
+        return self.descriptor_and_direction
 
     def getDescriptorAndDirectionTrunc(self, l) -> str:
         """
@@ -804,47 +877,52 @@ class Stop:
 
         @returns A truncated string representation of this routes descriptor and direction
         """
-        remaining_l = max(0, l - len(str(self.direction.value)) - 1)
-        return self.descriptor[0:remaining_l] + " " + str(self.direction.value)
+        # Cached by length since the reports ask for it on every row
+        descriptor_and_direction = self.descriptor_truncs.get(l)
+        if descriptor_and_direction is None:
+            remaining_l = max(0, l - len(self.direction_string) - 1)
+            descriptor_and_direction = self.descriptor[0:remaining_l] + " " + \
+                self.direction_string
+            self.descriptor_truncs[l] = descriptor_and_direction
+        return descriptor_and_direction
 
     def getRun(self, datetime) -> str:
         # If datetime does not exist, return None
-        if datetime not in self.data:
-            return None
-
-        return self.data[datetime][0]
+        return self.runs.get(datetime)
 
     def getOffsAndOns(self, datetime) -> tuple:
         """
         @returns the offs and ons for a specific datetime
         """
         # If datetime does not exist, return zeros
-        if datetime not in self.data:
-            return 0, 0
-
-        return self.data[datetime][3], self.data[datetime][4]
+        return self.offs.get(datetime, 0), self.ons.get(datetime, 0)
 
     def getOffsOnsAndLoad(self, datetime) -> tuple:
         """
         @returns the offs ons and load for a specific datetime
         """
         # If datetime does not exist, return zeros
-        if datetime not in self.data:
-            return 0, 0, 0
-
-        return self.data[datetime][3], self.data[datetime][4],\
-            self.data[datetime][5]
+        return self.offs.get(datetime, 0), self.ons.get(datetime, 0), \
+            self.loads.get(datetime, 0)
 
     def getTotalOffsAndOns(self) -> tuple:
         """
         @returns the total offs and ons for all datetimes at this stop
         """
-        total_offs = 0
-        total_ons = 0
-        for datetime in self.data:
-            total_offs += self.data[datetime][3]
-            total_ons += self.data[datetime][4]
-        return total_offs, total_ons
+        offs, ons, _ = self.getTotals()
+        return offs, ons
+
+    def getTotals(self) -> tuple:
+        """
+        Sums this stop's data once and reuses it for every report that needs
+        the totals
+
+        @returns the total offs, ons and load for all datetimes at this stop
+        """
+        if self.totals is None:
+            self.totals = (sum(self.offs.values()), sum(self.ons.values()), \
+                sum(self.loads.values()))
+        return self.totals
 
     def getStreetTrunc(self, l) -> str:
         """
@@ -866,46 +944,27 @@ class Stop:
             return None
         return str(self.cross_street)[0:l]
 
-    def buildRouteTotalsByStop(self, worksheet, current_row, running_totals) -> Tuple[int, List[int]]:
+    def getRouteTotalsByStopRow(self, running_totals) -> list:
         """
-        Builds a route total for this stop for all datetimes
+        Builds a route total row for this stop for all datetimes
 
-        @param worksheet The worksheet to operate on
-        @param current_row The row to start on in the worksheet
-        @ param running_totals A list of running totals for each statistic
+        @param running_totals A list of running totals for each statistic. This
+            is updated in place.
 
-        @returns The next blank row on the workbook, the running totals
+        @returns The row values for this stop, columns A-K
         """
-        ons = 0
-        offs = 0
-        load = 0
-        
-        for key in self.data:
-            offs += self.data[key][3]
-            ons += self.data[key][4]
-            load += self.data[key][5]
-            
+        offs, ons, load = self.getTotals()
         total = ons + offs
 
-        # Write data to sheet
-        worksheet.cell(row=current_row, column=1).value = self.route
-        worksheet.cell(row=current_row, column=3).value = \
-            self.getDescriptorAndDirectionTrunc(19)
-        worksheet.cell(row=current_row, column=4).value = self.stop_no
-        worksheet.cell(row=current_row, column=6).value = self.getStreetTrunc(14)
-        worksheet.cell(row=current_row, column=7).value = self.getCrossStreetTrunc(14)
-        worksheet.cell(row=current_row, column=8).value = ons
-        worksheet.cell(row=current_row, column=9).value = offs
-        worksheet.cell(row=current_row, column=10).value = total
-        worksheet.cell(row=current_row, column=11).value = load
-
         # Update the running totals
         running_totals[0] += ons
         running_totals[1] += offs
         running_totals[2] += total
         running_totals[3] += load
 
-        return current_row + 1, running_totals
+        return [self.route, None, self.getDescriptorAndDirectionTrunc(19), \
+            self.stop_no, None, self.getStreetTrunc(14), \
+            self.getCrossStreetTrunc(14), ons, offs, total, load]
 
     def getMinutesLate(self, datetime) -> int:
         """
@@ -915,60 +974,122 @@ class Stop:
         @returns How many minutes the bus was late. Early busses are negatives.
             Returns None if datetime does not exist.
         """
-        # If datetime doesn't exist, return None
-        if datetime not in self.data:
-            return None
-        
-        # If datetime does not have an arrival time or schedule time, ret None
-        data = self.data[datetime]
-        if data[1] is None or data[2] is None:
-            return None
-
-        # Data presumed good, return difference in minutes      
-        delta = data[1] - data[2]
-        return round(delta.total_seconds() / 60)
+        # Not stored if there was no arrival time or schedule time
+        return self.minutes_late.get(datetime)
 
-    def buildDetailReport(self, worksheet, current_row, col_totals) -> Dict[int, int]:
+    def getDetailReportRow(self, route_times, col_totals) \
+        -> Tuple[list, Dict[int, int]]:
         """
         Builds a single row of a detail report sheet.
 
-        @param worksheet The worksheet to modify
-        @param current_row The current row being operated on
+        @param route_times The route's datetimes, already sorted by time, date
         @param col_totals A running total of all displayed columns for this route
 
-        @returns A dictionary of the current column totals
+        @returns The row values for this stop, a dictionary of the current
+            column totals
         """
         # Display header
-        worksheet.cell(row=current_row, column=2).value = self.stop_no
-        worksheet.cell(row=current_row, column=3).value = self.getStreetTrunc(10)
-        worksheet.cell(row=current_row, column=4).value = self.getCrossStreetTrunc(10)
+        row = [None, self.stop_no, self.getStreetTrunc(10), \
+            self.getCrossStreetTrunc(10)]
 
-        # Display data for each datetime
+        # Display data for each datetime. buildLoad stores a load for every
+        # route datetime, so the route's sorted times match this stop's keys.
         col = 5
-        keys = list(self.data.keys())
-        keys.sort(key=lambda x: (x.time(), x.date()))
-        for datetime in keys:
-            # Add data to the sheet
-            worksheet.cell(row=current_row, column=col).value = \
-                self.data[datetime][4]
-            worksheet.cell(row=current_row, column=col + 1).value = \
-                self.data[datetime][3]
-            worksheet.cell(row=current_row, column=col + 2).value = \
-                self.data[datetime][5]
+        ons_by_time = self.ons
+        offs_by_time = self.offs
+        loads = self.loads
+        for datetime in route_times:
+            ons = ons_by_time.get(datetime, 0)
+            offs = offs_by_time.get(datetime, 0)
+            load = loads[datetime]
+
+            # Add data to the row
+            row.extend([ons, offs, load])
 
             # Add the totals to the running totals dict
-            # Ternary ops handle the case of uninitialized columns
-            col_totals[col] = self.data[datetime][4] + (col_totals[col] if col in col_totals else 0)
-            col_totals[col + 1] = self.data[datetime][3] + (col_totals[col + 1] if col + 1 in col_totals else 0)
-            col_totals[col + 2] = self.data[datetime][5] + (col_totals[col + 2] if col + 2 in col_totals else 0)
+            # Defaults handle the case of uninitialized columns
+            col_totals[col] = ons + col_totals.get(col, 0)
+            col_totals[col + 1] = offs + col_totals.get(col + 1, 0)
+            col_totals[col + 2] = load + col_totals.get(col + 2, 0)
 
             # Increment the current column
             col += 3
 
-        # Return the column totals
-        return col_totals
+        # Return the row and the column totals
+        return row, col_totals
         
 
+@lru_cache(maxsize=4096)
+def timeToTimedelta(time) -> datetime.timedelta:
+    """
+    Converts a time of day to the time elapsed since midnight. Memoized since
+    arrival and schedule times repeat across runs and dates.
+
+    @param time The datetime.time to convert
+    @returns A timedelta of the same length as the time since midnight
+    """
+    return datetime.timedelta(hours=time.hour, minutes=time.minute, \
+        seconds=time.second, microseconds=time.microsecond)
+
+
+def openInputWorkbook(filepath):
+    """
+    Opens an input workbook for a single streaming pass. Only the cached cell
+    values are loaded, not formulas, so a caller that needs formulas should
+    change this function rather than open the file a second time.
+
+    @param filepath The filepath for the workbook
+    @returns The read-only workbook. The caller must close it.
+    """
+    return openpyxl.load_workbook(filename=filepath, read_only=True, \
+        data_only=True, keep_links=False)
+
+
+def readBusStopRows(bus_stop_wb) -> List[tuple]:
+    """
+    Reads the first sheet of a bus stop workbook into memory and closes the
+    workbook. This runs on a background thread while the ride checks file is
+    parsed, so it must not write to the log.
+
+    @param bus_stop_wb The bus stop workbook, opened with openInputWorkbook
+    @returns A list with one (street, cross_street, stop_no, marker, value,
+        is_timed) tuple per sheet row. These are columns C, D, E, H and J, and
+        is_timed is True if column C is filled in.
+    """
+    rows = []
+    try:
+        for cells in bus_stop_wb.worksheets[0].iter_rows(max_col=10):
+            fill = cells[2].fill
+            is_timed = fill is not None and fill.patternType is not None
+            rows.append((cells[2].value, cells[3].value, cells[4].value, \
+                cells[7].value, cells[9].value, is_timed))
+    finally:
+        bus_stop_wb.close()
+    return rows
+
+
+def saveErrorFile(log:Log, output_filepath, message) -> int:
+    """
+    Logs a major error and saves it to a short text file next to the output
+    workbook, so the reason no workbook was created is kept on disk.
+
+    @param output_filepath The filepath for the output workbook
+    @param message The error message
+    @returns 1, the major error status of generateSummary
+    """
+    log.logError("%s", message)
+    log.logError("No output workbook was saved to '%s'", output_filepath)
+
+    error_filepath = str(output_filepath) + ".error.txt"
+    try:
+        with open(error_filepath, "w") as error_file:
+            error_file.write(message + "\n")
+        log.logGeneral("The error was saved to '%s'", error_filepath)
+    except OSError:
+        log.logError("Could not save the error file '%s'", error_filepath)
+    return 1
+
+
 def generateSummary(log:Log, ride_checks_filepath, bus_stop_filepath, 
     output_filepath) -> int:
     """
@@ -981,47 +1102,204 @@ def generateSummary(log:Log, ride_checks_filepath, bus_stop_filepath,
 
     @returns An integer representing the status of the output workbook:
         0 - OK, success or minor errors
-        1 - Major error. Check the workbook log for details.
+        1 - Major error, no output workbook is saved. The error is saved
+            to a .error.txt file next to the output filepath.
         2 - Output workbook could not be created
     """
 
-    # Create output workbook / sheet. Set date format to ISO 8601
-    wb = openpyxl.Workbook()
+    # Create output workbook / sheets. Set date format to ISO 8601
+    # The workbook is write-only, so every sheet is created up front and the
+    # sheet builders only append rows
+    wb = openpyxl.Workbook(write_only=True)
     wb.iso_dates = True
+    routeTotalsSheet = wb.create_sheet("Rte Totals")
+    maxLoadSheet = wb.create_sheet("Max Load")
+    routeTotalsByStopSheet = wb.create_sheet("Ons Offs Tot & Ld")
+    onTimeSheet = wb.create_sheet("On Time Detail")
+    detailReportSheet = wb.create_sheet("Detail Report")
+    wb.create_sheet("Notes")
 
     log.logGeneral("Output document created")
 
-    # Try to open the ride checks file, if can't return major error
-    log.logGeneral("Loading ride checks workbook (this may take some time)")
+    # Try to open the bus stop file, if can't return major error. It is
+    # opened up front so a bad file fails before the ride checks are parsed.
+    log.logGeneral("Loading bus stop workbook")
     try:
-        ride_checks_wb = openpyxl.load_workbook(filename=ride_checks_filepath, data_only=True)
+        bus_stop_wb = openInputWorkbook(bus_stop_filepath)
     except Exception:
-        log.logError("Could not open the ride checks workbook '" +\
-            ride_checks_filepath + "'")
-        
-        # Try to save the output file
-        try:
-            wb.save(output_filepath)
-        except Exception:
-            return 2
-        return 1
-    ride_checks = ride_checks_wb.active
+        return saveErrorFile(log, output_filepath, \
+            "Could not open the bus stop workbook '%s'" % bus_stop_filepath)
 
-    # Try to open the bus stop file, if can't return major error
-    log.logGeneral("Loading bus stop workbook")
+    # Read the bus stop rows in the background. Its routes and stops are not
+    # needed until the ride checks file has been parsed.
+    executor = ThreadPoolExecutor(max_workers=1)
+    bus_stop_future = executor.submit(readBusStopRows, bus_stop_wb)
+
+    # The executor is shut down however the parse ends. The bus stop
+    # workbook is closed here if its read was cancelled before it started.
     try:
-        bus_stop_wb = openpyxl.load_workbook(filename=bus_stop_filepath, data_only=True)
-    except Exception:
-        log.logError("Could not open the bus stop workbook '" +\
-            bus_stop_filepath + "'")
-        
-        # Try to save the output file
+        # Try to open the ride checks file, if can't return major error
+        log.logGeneral("Loading ride checks workbook (this may take some time)")
         try:
-            wb.save(output_filepath)
+            ride_checks_wb = openInputWorkbook(ride_checks_filepath)
         except Exception:
-            return 2
-        return 1
-    bus_stop = bus_stop_wb.worksheets[0]
+            return saveErrorFile(log, output_filepath, \
+                "Could not open the ride checks workbook '%s'" % \
+                ride_checks_filepath)
+        ride_checks = ride_checks_wb.active
+
+        # start parsing the ride checks file
+        # Valid rows are held until the bus stop file has been read
+        log.logGeneral("Parsing ride checks file")
+        ride_check_data = []
+        next_seq = 1
+        total_ons = 0
+        total_offs = 0
+        date_midnight_cache = {}
+        start_datetime_cache = {}
+
+        # Bind per-row lookups to locals ahead of the loop
+        add_ride_check = ride_check_data.append
+        date_type = datetime.date
+        time_type = datetime.time
+        # The workbook is closed even if a row cannot be parsed
+        try:
+            for current_row, row in enumerate(ride_checks.iter_rows(min_row=2, \
+                max_col=14, values_only=True), start=2):
+                # Stop at the first row without a sequence number
+                if row[0] is None:
+                    break
+
+                # get data
+                sequence, date, route, direction, run, start_time, onboard, \
+                    stop_number, arrival_time, schedule_time, offs, ons, *_ = row
+
+                # Check that the sequence number is in order, alert if not. The
+                # expected value is kept so no arithmetic is done on a sequence
+                # that fails the type check below.
+                if sequence != next_seq:
+                    log.logWarning("Out-of-order sequence number: Row %d", \
+                        current_row)
+                if isinstance(sequence, int):
+                    next_seq = sequence + 1
+
+                # check that all required data is the proper type
+                # Valid rows pass one combined check, ordered so the checks that
+                # fail most often in practice (direction typos) come first. The
+                # columns are only checked one at a time, in column order, to
+                # report why a row is being skipped.
+                row_direction = stringToDirection(direction)
+                if not (row_direction is not Direction.UN and \
+                    isinstance(sequence, int) and isinstance(route, int) and \
+                    isinstance(date, date_type) and \
+                    type(start_time) is time_type):
+                    if not isinstance(sequence, int):
+                        log.logError("Row %d: Sequence '%s' is not an integer. " + \
+                            "Skipping row.", current_row, sequence)
+                    elif not isinstance(date, date_type):
+                        log.logError("Row %d: Date '%s' is not an excel-formatted " + \
+                            "date. Skipping row.", current_row, date)
+                    elif not isinstance(route, int):
+                        log.logError("Row %d: Route '%s' is not an integer. " + \
+                            "Skipping row.", current_row, route)
+                    elif row_direction is Direction.UN:
+                        log.logError("Row %d: Direction '%s' is not a valid " + \
+                            "input. Skipping row.", current_row, direction)
+                    else:
+                        log.logError("Row %d: Start time '%s' is not an " + \
+                            "excel-formatted time. Skipping row.", current_row, \
+                            start_time)
+                    continue
+
+                # check that all optional data is the correct format if filled in
+                # Times are checked by exact type, as openpyxl never returns a
+                # subclass. Rows that fail are checked again below, after blank
+                # strings are corrected, one column at a time to report why a row
+                # is being skipped.
+                if not ((onboard is None or isinstance(onboard, int)) and \
+                    (arrival_time is None or type(arrival_time) is time_type) \
+                    and (schedule_time is None or \
+                    type(schedule_time) is time_type) and \
+                    (ons is None or isinstance(ons, int)) and \
+                    (offs is None or isinstance(offs, int))):
+                    # correct blank strings in optional data
+                    if arrival_time == "":
+                        arrival_time = None
+                    if schedule_time == "":
+                        schedule_time = None
+                    if ons == "":
+                        ons = None
+                    if offs == "":
+                        offs = None
+
+                    skip_row = False
+                    for label, value, value_type, problem in (
+                        ("Onboard", onboard, int, "is not an integer. "),
+                        ("Arrival time", arrival_time, time_type, \
+                            "is not an excel-formatted time."),
+                        ("Scheduled time", schedule_time, time_type, \
+                            "is not an excel-formatted time."),
+                        ("Ons value", ons, int, "is not an integer. "),
+                        ("Offs value", offs, int, "is not an integer. ")):
+                        if value is not None and not isinstance(value, value_type):
+                            log.logError("Row %d: %s '%s' %sSkipping row.", \
+                                current_row, label, value, problem)
+                            skip_row = True
+                            break
+                    if skip_row:
+                        continue
+
+                # order of placement is route string -> date and time -> stop_number
+                # Datetimes are built from a cached midnight of each date
+                date_midnight = date_midnight_cache.get(date)
+                if date_midnight is None:
+                    date_midnight = datetime.datetime(date.year, date.month, date.day)
+                    date_midnight_cache[date] = date_midnight
+
+                # Every stop of a trip shares one start datetime object, which
+                # keeps the route and stop dict lookups keyed on it cheap
+                start_key = (date, start_time)
+                start_datetime = start_datetime_cache.get(start_key)
+                if start_datetime is None:
+                    start_datetime = date_midnight + timeToTimedelta(start_time)
+                    start_datetime_cache[start_key] = start_datetime
+
+                arrival_datetime = None
+                if arrival_time is not None:
+                    arrival_datetime = date_midnight + timeToTimedelta(arrival_time)
+
+                schedule_datetime = None
+                if schedule_time is not None:
+                    schedule_datetime = date_midnight + timeToTimedelta(schedule_time)
+
+                # increment total ons and offs, blank and zero counts are skipped
+                if ons:
+                    total_ons += ons
+                if offs:
+                    total_offs += offs
+
+                # Blank and negative counts are stored as zero
+                if ons is None or ons < 0:
+                    ons = 0
+                if offs is None or offs < 0:
+                    offs = 0
+
+                add_ride_check((current_row, route, row_direction, \
+                    stop_number, start_datetime, run, arrival_datetime, \
+                    schedule_datetime, offs, ons, onboard))
+        finally:
+            ride_checks_wb.close()
+
+        # Wait for the bus stop rows, if they can't be read return major error
+        try:
+            bus_stop_rows = bus_stop_future.result()
+        except Exception:
+            return saveErrorFile(log, output_filepath, \
+                "Could not read the bus stop workbook '%s'" % bus_stop_filepath)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if bus_stop_future.cancelled():
+            bus_stop_wb.close()
 
     route_manager = RouteManager(log)
 
@@ -1031,172 +1309,65 @@ def generateSummary(log:Log, ride_checks_filepath, bus_stop_filepath,
     current_direction = None
     current_route_name = None
     current_city = None
+    awaiting_direction = False
+    street_two_rows_up = None
+    street_one_row_up = None
+
+    for street, cross_street, stop_no, marker, value, is_timed \
+        in bus_stop_rows:
+        # The direction of a new route is on the row after its header
+        if awaiting_direction:
+            current_direction = stringToDirection(value)
+            route_manager.setRouteData(current_route, current_route_name, current_direction)
+            awaiting_direction = False
 
-    for current_row in range(1,bus_stop.max_row + 1):
         # Check for new route header
-        if bus_stop.cell(row=current_row, column=8).value == "ROUTE":
+        if marker == "ROUTE":
             # Get info of the new route
-            current_route = bus_stop.cell(row=current_row, column=10).value
-            current_route_name = \
-                bus_stop.cell(row=current_row, column=4).value
-            current_direction = stringToDirection(
-                bus_stop.cell(row=current_row + 1, column=10).value)
-
-            # Set the route data
-            route_manager.setRouteData(current_route, current_route_name, current_direction)
+            current_route = value
+            current_route_name = cross_street
+            awaiting_direction = True
 
-            # If the city name is unset, pull it from this header
+            # If the city name is unset, pull it from two rows above the header
             if current_city is None:
-                current_city = str(bus_stop.cell(row=current_row - 2, column=3).value)
+                current_city = str(street_two_rows_up)
+
+        street_two_rows_up = street_one_row_up
+        street_one_row_up = street
 
-        # If current route is None, skip this row
-        if current_route is None:
+        # If current route is None or the direction is not known yet, skip
+        # this row
+        if current_route is None or awaiting_direction:
             continue
 
         # If stop number is numerical, add this row
-        stop_no = bus_stop.cell(row=current_row, column=5).value
         if isinstance(stop_no, int):
-            street = bus_stop.cell(row=current_row, column=3).value
-            cross_street = bus_stop.cell(row=current_row, column=4).value
-            is_timed = bus_stop.cell(row=current_row, column=3).fill.patternType != None
             route_manager.addStop(current_route, current_direction, stop_no, street, cross_street, is_timed)
 
+    # A route header on the last row has no direction row
+    if awaiting_direction:
+        route_manager.setRouteData(current_route, current_route_name, Direction.UN)
+
     # Get the city name from the bus stop file
     # Done here so all routes are affected by this change
     route_manager.setCityName(current_city)
 
-    # start parsing the ride checks file
-    log.logGeneral("Parsing ride checks file")
-    current_row = 2
-    prev_seq = 0
-    total_ons = 0
-    total_offs = 0
-    while(ride_checks.cell(row=current_row, column=1).value is not None):
-        # get data
-        sequence = ride_checks.cell(row=current_row, column=1).value
-        date = ride_checks.cell(row=current_row, column=2).value
-        route = ride_checks.cell(row=current_row, column=3).value
-        direction = ride_checks.cell(row=current_row, column=4).value
-        run = ride_checks.cell(row=current_row, column=5).value
-        start_time = ride_checks.cell(row=current_row, column=6).value
-        onboard = ride_checks.cell(row=current_row, column=7).value
-        stop_number = ride_checks.cell(row=current_row, column=8).value
-        arrival_time = ride_checks.cell(row=current_row, column=9).value
-        schedule_time = ride_checks.cell(row=current_row, column=10).value
-        offs = ride_checks.cell(row=current_row, column=11).value
-        ons = ride_checks.cell(row=current_row, column=12).value
-        #loads = ride_checks.cell(row=current_row, column=13).value
-        #time_check = ride_checks.cell(row=current_row, column=14).value
-
-        # Check that the sequence number is in order, alert if not
-        if sequence - 1 != prev_seq:
-            log.logWarning("Out-of-order sequence number: Row " +
-            str(current_row))
-        prev_seq = sequence
-
-        # check that all required data is the proper type
-        if not isinstance(sequence, int):
-            log.logError("Row " + str(current_row) + ": Sequence '" + \
-                str(sequence) + "' is not an integer. Skipping row.")
-            current_row += 1
-            continue
-        if not isinstance(date, datetime.date):
-            log.logError("Row " + str(current_row) + ": Date '" + \
-                str(date) + "' is not an excel-formatted date. " + \
-                "Skipping row.")
-            current_row += 1
-            continue
-        if not isinstance(route, int):
-            log.logError("Row " + str(current_row) + ": Route '" + \
-                str(route) + "' is not an integer. Skipping row.")
-            current_row += 1
-            continue
-        if stringToDirection(direction) == Direction.UN:
-            log.logError("Row " + str(current_row) + ": Direction '" + \
-                str(direction) + "' is not a valid input. Skipping row.")
-            current_row += 1
-            continue 
-        if (not isinstance(start_time, datetime.time)):
-            log.logError("Row " + str(current_row) + ": Start time '" + \
-                str(start_time) + "' is not an excel-formatted time. " + \
-                "Skipping row.")
-            current_row += 1
-            continue
-
-        # correct blank strings in optional data
-        if arrival_time == "":
-            arrival_time = None
-        if schedule_time == "":
-            schedule_time = None
-        if ons == "":
-            ons = None
-        if offs == "":
-            offs = None
-
-        # check that all optional data is the correct format if filled in
-        if (onboard is not None) and (not isinstance(onboard, int)):
-            log.logError("Row " + str(current_row) + ": Onboard '" + \
-                str(onboard) + "' is not an integer. Skipping row.")
-            current_row += 1
-            continue
-        if (arrival_time is not None) and (not isinstance(arrival_time, \
-            datetime.time)):
-            log.logError("Row " + str(current_row) + ": Arrival time '" + \
-                str(arrival_time) + "' is not an excel-formatted time."\
-                + "Skipping row.")
-            current_row += 1
-            continue
-        if (schedule_time is not None) and (not isinstance(schedule_time, \
-            datetime.time)):
-            log.logError("Row " + str(current_row) + ": Scheduled time '" + \
-                str(schedule_time) + "' is not an excel-formatted time."\
-                + "Skipping row.")
-            current_row += 1
-            continue
-        if (ons is not None) and (not isinstance(ons, int)):
-            log.logError("Row " + str(current_row) + ": Ons value '" + \
-            str(ons) + "' is not an integer. Skipping row.")
-            current_row += 1
-            continue   
-        if (offs is not None) and (not isinstance(offs, int)):
-            log.logError("Row " + str(current_row) + ": Offs value '" + \
-            str(offs) + "' is not an integer. Skipping row.")
-            current_row += 1
-            continue           
-
-        # add data to the route manager object
-        # order of placement is route string -> date and time -> stop_number
-        start_datetime = datetime.datetime.combine(date, start_time)
-
-        arrival_datetime = None
-        if arrival_time is not None:
-            arrival_datetime = datetime.datetime.combine(date, arrival_time)
-
-        schedule_datetime = None
-        if schedule_time is not None:
-            schedule_datetime = datetime.datetime.combine(date, schedule_time)
-
-        direction = stringToDirection(direction)
-
-        add_data_result = route_manager.addData(route, direction, stop_number, \
+    # add data to the route manager object
+    add_data = route_manager.addData
+    for current_row, route, direction, stop_number, start_datetime, run, \
+        arrival_datetime, schedule_datetime, offs, ons, onboard \
+        in ride_check_data:
+        add_data_result = add_data(route, direction, stop_number, \
             start_datetime, run, arrival_datetime, schedule_datetime, offs, \
             ons, onboard)
 
         if not add_data_result:
-            log.logError("Row " + str(current_row) + ": Add data failure.")
-
-        # increment total ons and offs
-        if ons is not None:
-            total_ons += ons
-        if offs is not None:
-            total_offs += offs
-
-        # increment current row
-        current_row += 1
+            log.logError("Row %d: Add data failure.", current_row)
 
     # Check for total ons and offs being equal
     if total_ons != total_offs:
-        log.logWarning(f"Total ons and offs are not equal ({total_ons} ons, {total_offs} offs). Check for bad data")
+        log.logWarning("Total ons and offs are not equal (%d ons, %d offs). " + \
+            "Check for bad data", total_ons, total_offs)
     
     # Generate load data
     log.logGeneral("Building load data")
@@ -1205,38 +1376,26 @@ def generateSummary(log:Log, ride_checks_filepath, bus_stop_filepath,
     # DEBUG - Print all routes & stops & data
     # print(str(route_manager))
 
-    # Remove existing sheets
-    for s in wb.sheetnames:
-        wb.remove(wb[s])
-
     # Generate route totals sheet
     log.logGeneral("Generating route totals")
-    routeTotalsSheet = wb.create_sheet("Rte Totals")
     route_manager.buildRouteTotals(routeTotalsSheet)
 
     # Generate max load sheet
     log.logGeneral("Generating max load sheet")
-    maxLoadSheet = wb.create_sheet("Max Load")
     route_manager.buildMaxLoads(maxLoadSheet)
 
     # Generate totals by stop sheet
     log.logGeneral("Generating route totals per stop")
-    maxLoadSheet = wb.create_sheet("Ons Offs Tot & Ld")
-    route_manager.buildRouteTotalsByStop(maxLoadSheet)
+    route_manager.buildRouteTotalsByStop(routeTotalsByStopSheet)
 
     # Generate the on-time detail
     log.logGeneral("Generating on-time detail")
-    onTimeSheet = wb.create_sheet("On Time Detail")
     route_manager.buildOnTimeDetail(onTimeSheet)
 
     # Generate the detail report
     log.logGeneral("Generating detail report")
-    detailReportSheet = wb.create_sheet("Detail Report")
     route_manager.buildDetailReport(detailReportSheet)
 
-    # Add notes sheet
-    wb.create_sheet("Notes")
-
     # Generation complete
     log.logGeneral("Generation complete")
 
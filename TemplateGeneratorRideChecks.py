@@ -12,6 +12,24 @@ from Log import Log
 # Constants
 SHEET_TITLE = "Ride Checks"
 
+# Column letter, header and width of every ride checks column, in order
+RIDE_CHECK_COLUMNS = (
+    ("A", "SEQUENCE", 11),
+    ("B", "DATE", 10),
+    ("C", "ROUTE", 8),
+    ("D", "DIRECTION", 11),
+    ("E", "RUN", 6),
+    ("F", "START TIME", 12),
+    ("G", "ONBOARD", 10),
+    ("H", "STOP NUMBER", 15),
+    ("I", "ARRIVAL TIME", 15),
+    ("J", "SCHEDULE TIME", 15),
+    ("K", "OFFS", 6),
+    ("L", "ONS", 6),
+    ("M", "LOADS", 8),
+    ("N", "TIME CHECK", 12)
+)
+
 def createTemplateRideChecks(log:Log, filepath):
     # Create output workbook / sheet
     wb = openpyxl.Workbook()
@@ -19,34 +37,9 @@ def createTemplateRideChecks(log:Log, filepath):
     sheet.title = SHEET_TITLE
 
     # Create column headers
-    sheet["A1"] = "SEQUENCE"
-    sheet.column_dimensions["A"].width = 11
-    sheet["B1"] = "DATE"
-    sheet.column_dimensions["B"].width = 10
-    sheet["C1"] = "ROUTE"
-    sheet.column_dimensions["C"].width = 8
-    sheet["D1"] = "DIRECTION"
-    sheet.column_dimensions["D"].width = 11
-    sheet["E1"] = "RUN"
-    sheet.column_dimensions["E"].width = 6
-    sheet["F1"] = "START TIME"
-    sheet.column_dimensions["F"].width = 12
-    sheet["G1"] = "ONBOARD"
-    sheet.column_dimensions["G"].width = 10
-    sheet["H1"] = "STOP NUMBER"
-    sheet.column_dimensions["H"].width = 15
-    sheet["I1"] = "ARRIVAL TIME"
-    sheet.column_dimensions["I"].width = 15
-    sheet["J1"] = "SCHEDULE TIME"
-    sheet.column_dimensions["J"].width = 15
-    sheet["K1"] = "OFFS"
-    sheet.column_dimensions["K"].width = 6
-    sheet["L1"] = "ONS"
-    sheet.column_dimensions["L"].width = 6
-    sheet["M1"] = "LOADS"
-    sheet.column_dimensions["M"].width = 8
-    sheet["N1"] = "TIME CHECK"
-    sheet.column_dimensions["N"].width = 12
+    sheet.append([header for _, header, _ in RIDE_CHECK_COLUMNS])
+    for column, _, width in RIDE_CHECK_COLUMNS:
+        sheet.column_dimensions[column].width = width
 
     # Save the file
-    wb.save(filepath)
\ No newline at end of file
+    wb.save(filepath)
@@ -11,8 +11,9 @@
 
 import win32com.client
 import openpyxl
-import math
 import datetime
+from calendar import monthrange
+from functools import lru_cache
 
 from Log import Log
 
@@ -34,6 +35,16 @@ VALID_HEADERS = [
     ["loads", "load", "ld"],
     ["time check", "time chk", "time", "check"]
 ]
+# The column indexes that accept each header alias. Some aliases, such as
+# "arrival", are accepted by more than one column.
+HEADER_COLUMNS = {alias: frozenset(col for col, headers in \
+    enumerate(VALID_HEADERS) if alias in headers) \
+    for aliases in VALID_HEADERS for alias in aliases}
+
+# Memoized date and time construction. Ride checks repeat the same few dates
+# and every time of day fits in the cache.
+makeDate = lru_cache(maxsize=4096)(datetime.date)
+makeTime = lru_cache(maxsize=1440)(datetime.time)
 
 class ExcelApplication:
     def __init__(self):
@@ -69,105 +80,128 @@ def convertFormat(log:Log, old_filepath, new_filepath) -> None:
     excelApp = ExcelApplication()
     excelApp.convertToXLSX(old_filepath, new_filepath)
 
-def convertValues(log:Log, filepath, save_filepath=None) -> None:
+def convertTime(log:Log, row, time_no, label):
     '''
-    Updates the values of a .xlsx workbook to match the required format.
-    Numerical dates and times become excel-format dates and times.
-
-    @param filepath The filepath of the excel document.
-    @param save_filepath Optional: The filepath to save the document to
+    Changes a numerical HHMM time into an excel-format time. A warning is
+    logged for values that cannot be converted, values that are already
+    excel-format times are left alone.
+
+    @param row The row number of the value, used in warnings
+    @param time_no The numerical time to convert
+    @param label The name of the column, used in warnings
+    @returns The converted datetime.time, or None if it could not be converted
     '''
-    if save_filepath is None:
-        save_filepath = filepath
+    if isinstance(time_no, int):
+        hour = (time_no // 100) % 100
+        if hour > 23:
+            hour %= 24
+        minute = time_no % 100
+        if 0 > hour or 23 < hour or 0 > minute or 59 < minute:
+            log.logWarning("Row %d: bad times calculated - %02d:%02d. Check " + \
+                "input data.", row, hour, minute)
+        else:
+            return makeTime(hour, minute)
+    elif not isinstance(time_no, datetime.time):
+        log.logWarning("Row %d: The %s is not an integer. Check input data", \
+            row, label)
+    return None
 
-    # Load the file
-    try:
-        wb = openpyxl.load_workbook(filename=filepath)
-    except:
-        log.logError("Could not load the workbook")
-        return
-    ride_checks = wb.active
+def convertRideChecks(log:Log, ride_checks) -> None:
+    '''
+    Changes the numerical dates and times of a ride checks sheet into
+    excel-format dates and times. Cells are updated in place.
 
+    @param ride_checks The ride checks worksheet
+    '''
     # Check that the headers are correct, warn if not
-    for col in range(1, 15):
-        cell_string = str(ride_checks.cell(row=1, column=col).value)
-        if cell_string.lower() not in VALID_HEADERS[col-1]:
+    header_row = next(ride_checks.iter_rows(max_row=1, max_col=14, \
+        values_only=True), ())
+    header_row = (tuple(header_row) + (None,) * 14)[:14]
+    for col, header in enumerate(header_row, start=1):
+        cell_string = str(header)
+        header_columns = HEADER_COLUMNS.get(cell_string.strip().lower(), ())
+        if col-1 not in header_columns:
             col_letter = openpyxl.utils.get_column_letter(col)
-            log.logWarning(f"The value for column {col_letter}, '{cell_string}', is not a valid header value. Please check that this column contains data representing the {VALID_HEADERS[col-1][0]}")
-
-    # Go through sheet until out of rows, skipping header
-    row = 2
-    while ride_checks.cell(row=row, column=1).value is not None:
-        # Change date column
-        date_no = ride_checks.cell(row=row, column=2).value
+            log.logWarning("The value for column %s, '%s', is not a valid " + \
+                "header value. Please check that this column contains data " + \
+                "representing the %s", col_letter, cell_string, \
+                VALID_HEADERS[col-1][0])
+
+            # Point out headers that belong to another column, as the
+            # columns may be out of order
+            if header_columns:
+                log.logWarning("The header in column %s, '%s', is the " + \
+                    "header for the %s column. Check the column order.", \
+                    col_letter, cell_string, " / ".join( \
+                    VALID_HEADERS[other][0] for other in sorted(header_columns)))
+
+    # Go through sheet until out of rows, skipping header. Only the cells
+    # that may be converted are looked up.
+    for row in range(2, ride_checks.max_row + 1):
+        if ride_checks.cell(row=row, column=1).value is None:
+            break
+
+        # Change date column, dates that are already excel-format are kept
+        date_cell = ride_checks.cell(row=row, column=2)
+        date_no = date_cell.value
         if isinstance(date_no, int):
             year = date_no % 100
             if year < 100:
                 year = year + 2000
-            month = math.floor(date_no / 10000) % 100
-            day = math.floor(date_no / 100) % 100
+            month = (date_no // 10000) % 100
+            day = (date_no // 100) % 100
             if 1900 > year or year > 2100 or 1 > month or month > 12 or \
-                1 > day or day > 31:
-                log.logWarning(f"Row {row}: bad date calculated - {year:04}-{month:02}-{day:02}. Check input data.")
+                1 > day or day > monthrange(year, month)[1]:
+                log.logWarning("Row %d: bad date calculated - %04d-%02d-%02d. " + \
+                    "Check input data.", row, year, month, day)
             else:
-                date = datetime.date(year, month, day)
-                ride_checks.cell(row=row, column=2).value = date
-        else:
-            log.logWarning(f"Row {row}: The date is not an integer. Check input data")
+                date_cell.value = makeDate(year, month, day)
+        elif not isinstance(date_no, datetime.date):
+            log.logWarning("Row %d: The date is not an integer. Check input " + \
+                "data", row)
 
         # Change start time column
-        time_no = ride_checks.cell(row=row, column=6).value
-        if isinstance(time_no, int):
-            hour = math.floor(time_no / 100) % 100
-            if hour > 23:
-                hour %= 24
-            minute = time_no % 100
-            if 0 > hour or 23 < hour or 0 > minute or 59 < minute:
-                log.logWarning(f"Row {row}: bad times calculated - {hour:02}:{minute:02}. Check input data.")
-            else:
-                time = datetime.time(hour, minute)
-                ride_checks.cell(row=row, column=6).value = time
-        else:
-            log.logWarning(f"Row {row}: The start time is not an integer. Check input data")
+        time_cell = ride_checks.cell(row=row, column=6)
+        time = convertTime(log, row, time_cell.value, "start time")
+        if time is not None:
+            time_cell.value = time
 
         # Change arrival time column, if cell is not empty
-        time_no = ride_checks.cell(row=row, column=9).value
-        if (time_no is not None) and (time_no != ""):
-            if isinstance(time_no, int):
-                hour = math.floor(time_no / 100) % 100
-                if hour > 23:
-                    hour %= 24
-                minute = time_no % 100
-                if 0 > hour or 23 < hour or 0 > minute or 59 < minute:
-                    log.logWarning(f"Row {row}: bad times calculated - {hour:02}:{minute:02}. Check input data.")
-                else:
-                    time = datetime.time(hour, minute)
-                    ride_checks.cell(row=row, column=9).value = time
-            else:
-                log.logWarning(f"Row {row}: The arrival time is not an integer. Check input data")
+        time_cell = ride_checks.cell(row=row, column=9)
+        if (time_cell.value is not None) and (time_cell.value != ""):
+            time = convertTime(log, row, time_cell.value, "arrival time")
+            if time is not None:
+                time_cell.value = time
 
         # Change schedule time column, if cell is not empty
-        time_no = ride_checks.cell(row=row, column=10).value
-        if (time_no is not None) and (time_no != ""):
-            if isinstance(time_no, int):
-                hour = math.floor(time_no / 100) % 100
-                if hour > 23:
-                    hour %= 24
-                minute = time_no % 100
-                if 0 > hour or 23 < hour or 0 > minute or 59 < minute:
-                    log.logWarning(f"Row {row}: bad times calculated - {hour:02}:{minute:02}. Check input data.")
-                else:
-                    time = datetime.time(hour, minute)
-                    ride_checks.cell(row=row, column=10).value = time
-            else:
-                log.logWarning(f"Row {row}: The schedule time is not an integer. Check input data")
+        time_cell = ride_checks.cell(row=row, column=10)
+        if (time_cell.value is not None) and (time_cell.value != ""):
+            time = convertTime(log, row, time_cell.value, "schedule time")
+            if time is not None:
+                time_cell.value = time
+
+def convertValues(log:Log, filepath, save_filepath=None) -> None:
+    '''
+    Updates the values of a .xlsx workbook to match the required format.
+    Numerical dates and times become excel-format dates and times.
+
+    @param filepath The filepath of the excel document.
+    @param save_filepath Optional: The filepath to save the document to
+    '''
+    if save_filepath is None:
+        save_filepath = filepath
+
+    # Load the file
+    try:
+        wb = openpyxl.load_workbook(filename=filepath)
+    except:
+        log.logError("Could not load the workbook")
+        return
+    convertRideChecks(log, wb.active)
 
-        # Increment
-        row += 1
-    
     # Try to save the output file
     try:
         wb.save(save_filepath)
         log.logGeneral("Succesfully updated the workbook.")
     except:
-        log.logFailure("Could not save the workbook.")
\ No newline at end of file
+        log.logFailure("Could not save the workbook.")